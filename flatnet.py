@@ -0,0 +1,195 @@
+"""
+Compact, flat feed-forward networks that evaluation workers read straight out
+of a shared-memory block, instead of unpickling a genome per task and building
+a neat.nn.FeedForwardNetwork from it.
+
+A network is a run of float64 values:
+
+    [num_inputs, num_outputs, num_nodes, num_links, num_slots,
+     output slots...,
+     (slot, bias, response, activation, aggregation, num_links) per node...,
+     (source slot, weight) per link...]
+
+Nodes are stored in topological order and their links follow in the same
+order. Slots index the value array: the inputs come first, then every node.
+Activation and aggregation functions are stored as their position in the
+config's activation_options / aggregation_options.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy
+from neat.graphs import feed_forward_layers
+
+HEADER_SIZE = 5
+NODE_SIZE = 6
+LINK_SIZE = 2
+
+
+def compile_genome(genome, config):
+    """
+    Flatten a genome into the float64 layout described above.
+    """
+    genome_config = config.genome_config
+    input_keys = genome_config.input_keys
+    output_keys = genome_config.output_keys
+    connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+    layers = feed_forward_layers(input_keys, output_keys, connections)
+
+    slots = {key: i for i, key in enumerate(input_keys)}
+    order = [node for layer in layers for node in layer]
+    for node in order:
+        slots[node] = len(slots)
+    # Outputs that nothing feeds stay at 0.0, as in FeedForwardNetwork
+    for key in output_keys:
+        if key not in slots:
+            slots[key] = len(slots)
+
+    links = {node: [] for node in order}
+    for inode, onode in connections:
+        if onode in links:
+            links[onode].append((slots[inode], genome.connections[inode, onode].weight))
+
+    nodes = []
+    flat_links = []
+    for node in order:
+        ng = genome.nodes[node]
+        nodes.append((slots[node], ng.bias, ng.response,
+                      genome_config.activation_options.index(ng.activation),
+                      genome_config.aggregation_options.index(ng.aggregation),
+                      len(links[node])))
+        flat_links.extend(links[node])
+
+    header = [len(input_keys), len(output_keys), len(nodes), len(flat_links), len(slots)]
+    outputs = [slots[key] for key in output_keys]
+    return numpy.concatenate([numpy.array(header + outputs, dtype=numpy.float64),
+                              numpy.array(nodes, dtype=numpy.float64).ravel(),
+                              numpy.array(flat_links, dtype=numpy.float64).ravel()])
+
+
+def pack(networks):
+    """
+    Concatenate compiled networks, returning the block and each one's offset.
+    """
+    offsets = []
+    position = 0
+    for network in networks:
+        offsets.append(position)
+        position += len(network)
+    if not networks:
+        return numpy.zeros(0, dtype=numpy.float64), offsets
+    return numpy.concatenate(networks), offsets
+
+
+class FlatNetwork(object):
+    """
+    Feed-forward network over a compiled run of a shared float64 block. The
+    node and link tables are numpy views, so nothing is copied out of the
+    block; only the small value array is private to the network.
+    """
+
+    def __init__(self, data, offset, config):
+        genome_config = config.genome_config
+        num_inputs, num_outputs, num_nodes, num_links, num_slots = \
+            data[offset:offset + HEADER_SIZE].astype(int)
+        position = offset + HEADER_SIZE
+        self.output_slots = data[position:position + num_outputs].astype(numpy.intp)
+        position += num_outputs
+        nodes = data[position:position + num_nodes * NODE_SIZE].reshape(num_nodes, NODE_SIZE)
+        position += num_nodes * NODE_SIZE
+        links = data[position:position + num_links * LINK_SIZE].reshape(num_links, LINK_SIZE)
+        sources = links[:, 0].astype(numpy.intp)
+        weights = links[:, 1]
+
+        self.num_inputs = num_inputs
+        self.values = numpy.zeros(num_slots)
+        self.node_evals = []
+        start = 0
+        for slot, bias, response, activation, aggregation, count in nodes:
+            end = start + int(count)
+            activation_name = genome_config.activation_options[int(activation)]
+            aggregation_name = genome_config.aggregation_options[int(aggregation)]
+            self.node_evals.append((int(slot), bias, response,
+                                    genome_config.activation_defs.get(activation_name),
+                                    None if aggregation_name == 'sum' else
+                                    genome_config.aggregation_function_defs.get(aggregation_name),
+                                    sources[start:end], weights[start:end]))
+            start = end
+
+    def activate(self, inputs):
+        if self.num_inputs != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, len(inputs)))
+
+        values = self.values
+        values[:self.num_inputs] = inputs
+        for slot, bias, response, act_func, agg_func, sources, weights in self.node_evals:
+            if agg_func is None:
+                s = values[sources].dot(weights)
+            else:
+                s = agg_func((values[sources] * weights).tolist())
+            values[slot] = act_func(bias + response * s)
+
+        return values[self.output_slots].tolist()
+
+
+# Per-worker state, set up once by the pool initializer
+worker_eval_function = None
+worker_config = None
+worker_block = None
+
+
+def init_worker(eval_function, config):
+    global worker_eval_function, worker_config
+    worker_eval_function = eval_function
+    worker_config = config
+
+
+def attach(name):
+    """
+    Map the generation's block read-only, dropping the previous generation's.
+    """
+    global worker_block
+    if worker_block is None or worker_block.name != name:
+        if worker_block is not None:
+            worker_block.close()
+        worker_block = shared_memory.SharedMemory(name=name)
+    data = numpy.ndarray(worker_block.size // 8, dtype=numpy.float64, buffer=worker_block.buf)
+    data.flags.writeable = False
+    return data
+
+
+def run_network(task):
+    name, offset = task
+    net = FlatNetwork(attach(name), offset, worker_config)
+    return worker_eval_function(net, worker_config)
+
+
+class SharedNetworkEvaluator(object):
+    """
+    Drop-in replacement for neat.ParallelEvaluator whose eval_function takes
+    (net, config) rather than (genome, config). Each generation is compiled
+    once into a shared-memory block; a task is only its (block, offset).
+    """
+
+    def __init__(self, num_workers, eval_function, config):
+        context = multiprocessing.get_context('spawn')
+        self.pool = context.Pool(num_workers, initializer=init_worker,
+                                 initargs=(eval_function, config))
+
+    def __del__(self):
+        self.pool.close()
+        self.pool.join()
+
+    def evaluate(self, genomes, config):
+        data, offsets = pack([compile_genome(genome, config) for _, genome in genomes])
+        block = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 8))
+        try:
+            view = numpy.ndarray(data.shape, dtype=numpy.float64, buffer=block.buf)
+            view[:] = data
+            del view
+            tasks = [(block.name, offset) for offset in offsets]
+            for (_, genome), fitness in zip(genomes, self.pool.map(run_network, tasks)):
+                genome.fitness = fitness
+        finally:
+            block.close()
+            block.unlink()
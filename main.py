@@ -1,59 +1,47 @@
 # https://neat-python.readthedocs.io/en/latest/xor_example.html
 from spaceinvaders import SpaceInvaders
+from steadystate import SteadyStateEvolution
+from flatnet import SharedNetworkEvaluator
+from speciation import VectorSpeciesSet
 import pygame
 import neat
 import os
 import time
 import random
-# import pickle
+import pickle
 
 
 class PlayGame:
-    def __init__(self, genome):
-        self.genome = genome
-        self.game = SpaceInvaders(0)
+    def __init__(self, frameTime=None, training=False):
+        self.fitness = 0
+        self.game = SpaceInvaders(0, frameTime, training)
 
     def test_ai(self, net):
         """
-        Test the AI against a human player by passing a NEAT neural network
+        Watch a NEAT neural network play a real-time game until it dies.
         """
-        clock = pygame.time.Clock()
-        run = True
-        while run:
-            clock.tick(60)
-            game_info = self.game.loop()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    run = False
-                    break
-
-            output = net.activate((self.right_paddle.y, abs(
-                self.right_paddle.x - self.ball.x), self.ball.y))
-            decision = output.index(max(output))
-
-            if decision == 1:  # AI moves up
-                self.game.move_paddle(left=False, up=True)
-            elif decision == 2:  # AI moves down
-                self.game.move_paddle(left=False, up=False)
-
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_w]:
-                self.game.move_paddle(left=True, up=True)
-            elif keys[pygame.K_s]:
-                self.game.move_paddle(left=True, up=False)
-
-            self.game.draw(draw_score=True)
-            pygame.display.update()
+        self.game.setup_game()
+        while self.game.shipAlive:
+            self.game.run_game()
+            self.move_ai_ship(net)
+            self.game.update_display()
+            self.game.clock.tick(60)
 
     def train_ai(self, genome, config):
         """
         Train the AI by passing two NEAT neural networks and the NEAt config object.
         These AI's will play to determine their fitness.
         """
-        start_time = time.time()
-
         net = neat.nn.FeedForwardNetwork.create(genome, config)
+        genome.fitness += self.train_net(net)
+
+        return False
+
+    def train_net(self, net):
+        """
+        Play games with an already built network and return the fitness it earned.
+        """
+        start_time = time.time()
 
         accum_score = 0
         while True:
@@ -65,12 +53,13 @@ class PlayGame:
                 # shooting all the time
                 # pygame.time.set_timer(pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)), random.randint(0, 9) * 100000000)
 
-                self.move_ai_ship(net)
+                if not self.move_ai_ship(net):  # If the movement makes the ship go off the screen punish the AI
+                    self.fitness -= 40
 
                 # if draw:
                 #     self.game.draw(draw_score=False, draw_hits=True)
 
-                pygame.display.update()
+                self.game.update_display()
                 # self.game.clock.tick(self.game.clockTick)
 
                 duration = time.time() - start_time
@@ -79,18 +68,18 @@ class PlayGame:
             # print(accum_score)
 
             if not self.game.shipAlive: # If die punish the AI
-                self.genome.fitness -= 40
+                self.fitness -= 40
 
 
             if accum_score >= 10000:
                 self.calculate_fitness(duration)
                 break
 
-        return False
+        return self.fitness
 
     def calculate_fitness(self,  duration):
-        self.genome.fitness += self.game.score + duration
-        print(self.genome.fitness)
+        self.fitness += self.game.score + duration
+        print(self.fitness)
 
 
     def move_ai_ship(self, net):
@@ -119,8 +108,7 @@ class PlayGame:
             valid = self.game.player.moveRight()
         # valid = random.choice([self.game.player.moveLeft(), self.game.player.moveRight()])
 
-        if not valid:  # If the movement makes the paddle go off the screen punish the AI
-            self.genome.fitness -= 40
+        return valid
 
 
 def eval_genomes(genomes, config):
@@ -128,13 +116,32 @@ def eval_genomes(genomes, config):
     for i, (genome_id, genome) in enumerate(genomes):
         genome.fitness = 0
 
-        game = PlayGame(genome)
+        game = PlayGame(training=True)
 
         force_quit = game.train_ai(genome, config)
         if force_quit:
             quit()
 
 
+def eval_genome(genome, config):
+    """
+    Play a single genome and return its fitness, so it can be evaluated in a
+    worker process.
+    """
+    genome.fitness = 0
+    game = PlayGame(training=True)
+    game.train_ai(genome, config)
+    return genome.fitness
+
+
+def eval_network(net, config):
+    """
+    Play a network that a worker mapped from shared memory and return its fitness.
+    """
+    game = PlayGame(training=True)
+    return game.train_net(net)
+
+
 def run_neat(config):
     p = neat.Population(config)
     p.add_reporter(neat.StdOutReporter(True))
@@ -146,18 +153,73 @@ def run_neat(config):
 
     # Display the winning genome.
     print('\nBest genome:\n{!s}'.format(winner))
-    # with open("best.pickle", "wb") as f:
-    #     pickle.dump(winner, f)
+    with open("best.pickle", "wb") as f:
+        pickle.dump(winner, f)
+
+
+def run_neat_shared(config, workers=None, generations=5):
+    """
+    Evaluate each generation in parallel, shipping the compiled networks to
+    the workers through one shared-memory block instead of pickled genomes.
+    """
+    # Workers are spawned, so they inherit this and never open a window
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    p = neat.Population(config)
+    p.add_reporter(neat.StdOutReporter(True))
+    stats = neat.StatisticsReporter()
+    p.add_reporter(stats)
+    p.add_reporter(neat.Checkpointer(1))
+
+    evaluator = SharedNetworkEvaluator(workers or os.cpu_count(), eval_network, config)
+    winner = p.run(evaluator.evaluate, generations)
+
+    # Display the winning genome.
+    print('\nBest genome:\n{!s}'.format(winner))
+    with open("best.pickle", "wb") as f:
+        pickle.dump(winner, f)
+
+
+def run_neat_large(workers=None, generations=5):
+    """
+    Run neatConfigLarge.txt (pop_size 1000) with vectorized speciation, so
+    the per-generation compatibility distances stay cheap.
+    """
+    config_path = os.path.join(os.path.dirname(__file__), 'neatConfigLarge.txt')
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         VectorSpeciesSet, neat.DefaultStagnation,
+                         config_path)
+    run_neat_shared(config, workers, generations)
+
+
+def run_neat_steady_state(config, workers=None, generations=5):
+    """
+    Evolve without waiting for the slowest genome of each generation: workers
+    keep playing while finished genomes are replaced and bred immediately.
+    """
+    # Workers are spawned, so they inherit this and never open a window
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    p = neat.Population(config)
+    p.add_reporter(neat.StdOutReporter(True))
+    stats = neat.StatisticsReporter()
+    p.add_reporter(stats)
+    p.add_reporter(neat.Checkpointer(1))
+
+    evolution = SteadyStateEvolution(p, workers)
+    winner = evolution.run(eval_genome, generations * config.pop_size)
+
+    # Display the winning genome.
+    print('\nBest genome:\n{!s}'.format(winner))
+    with open("best.pickle", "wb") as f:
+        pickle.dump(winner, f)
+
 
+def test_best_network(config):
+    with open("best.pickle", "rb") as f:
+        winner = pickle.load(f)
+    winner_net = neat.nn.FeedForwardNetwork.create(winner, config)
 
-# def test_best_network(config):
-#     with open("best.pickle", "rb") as f:
-#         winner = pickle.load(f)
-#     winner_net = neat.nn.FeedForwardNetwork.create(winner, config)
-#
-#     spcinvdrs = PlayGame()
-#     pygame.display.set_caption("SpcInvdrs")
-#     spcinvdrs.test_ai(winner_net)
+    spcinvdrs = PlayGame()
+    spcinvdrs.test_ai(winner_net)
 
 
 if __name__ == '__main__':
@@ -169,4 +231,7 @@ if __name__ == '__main__':
                          config_path)
 
     run_neat(config)
+    # run_neat_shared(config)
+    # run_neat_large()
+    # run_neat_steady_state(config)
     # test_best_network(config)
@@ -0,0 +1,80 @@
+import numpy
+import pygame
+
+# ITU-R 601 luma weights, pre-divided so frames come out in [0, 1]
+LUMA = (0.299 / 255, 0.587 / 255, 0.114 / 255)
+
+# Intensities used when rasterizing straight from the game state
+STATE_LAYERS = (('allBlockers', 0.3),
+                ('mysteryGroup', 0.4),
+                ('enemies', 0.6),
+                ('bullets', 0.8),
+                ('enemyBullets', 0.9),
+                ('playerGroup', 1.0))
+
+
+class PixelObservation(object):
+    """
+    Downsampled grayscale frames of a SpaceInvaders game for pixel based
+    controllers. Frames are written into a preallocated (stack, height,
+    width) float32 array; the newest frame is last.
+    """
+
+    def __init__(self, game, factor=8, stack=1):
+        self.game = game
+        self.factor = factor
+        width, height = game.screen.get_size()
+        self.width = -(-width // factor)
+        self.height = -(-height // factor)
+        self.frames = numpy.zeros((stack, self.height, self.width),
+                                  dtype=numpy.float32)
+        # surfarray indexes (x, y), so the scratch buffer is transposed
+        self._scratch = numpy.empty((self.width, self.height),
+                                    dtype=numpy.float32)
+
+    def reset(self):
+        self.frames.fill(0)
+
+    def _next_frame(self):
+        if len(self.frames) > 1:
+            self.frames[:-1] = self.frames[1:]
+        return self.frames[-1]
+
+    def observe(self):
+        """
+        Sample the game screen through a zero-copy pixels3d view. Every
+        factor-th pixel is taken (no filtering), so only the small
+        downsampled values are ever copied.
+        """
+        frame = self._next_frame().T
+        pixels = pygame.surfarray.pixels3d(self.game.screen)
+        try:
+            sampled = pixels[::self.factor, ::self.factor]
+            numpy.multiply(sampled[..., 0], LUMA[0], out=frame)
+            for channel in (1, 2):
+                numpy.multiply(sampled[..., channel], LUMA[channel],
+                               out=self._scratch)
+                frame += self._scratch
+        finally:
+            # The view keeps the screen locked, which would break blitting
+            del pixels
+        return self.frames
+
+    def observe_state(self):
+        """
+        Rasterize sprite rects straight into the downsampled frame, without
+        a full resolution draw. Thin sprites such as bullets always cover at
+        least one cell.
+        """
+        frame = self._next_frame()
+        frame.fill(0)
+        factor = self.factor
+        for name, intensity in STATE_LAYERS:
+            for sprite in getattr(self.game, name):
+                rect = sprite.rect
+                left = max(rect.left // factor, 0)
+                top = max(rect.top // factor, 0)
+                right = max(-(-rect.right // factor), 0)
+                bottom = max(-(-rect.bottom // factor), 0)
+                frame[top:bottom, left:right] = intensity
+        return self.frames
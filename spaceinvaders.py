@@ -49,12 +49,12 @@ class Ship(pygame.sprite.Sprite):
             self.rect.x -= self.speed
         if keys[pygame.K_RIGHT] and self.rect.x < 740:
             self.rect.x += self.speed
-        self.game.screen.blit(self.image, self.rect)
+        self.game.blit(self.image, self.rect)
 
     def moveLeft(self):
         if self.rect.x > 10:
             self.rect.x -= self.speed
-            self.game.screen.blit(self.image, self.rect)
+            self.game.blit(self.image, self.rect)
             return True
         else:
             return False
@@ -62,7 +62,7 @@ class Ship(pygame.sprite.Sprite):
     def moveRight(self):
         if self.rect.x < 740:
             self.rect.x += self.speed
-            self.game.screen.blit(self.image, self.rect)
+            self.game.blit(self.image, self.rect)
             return True
         else:
             return False
@@ -80,7 +80,7 @@ class Bullet(pygame.sprite.Sprite):
         self.game = game
 
     def update(self, keys, *args):
-        self.game.screen.blit(self.image, self.rect)
+        self.game.blit(self.image, self.rect)
         self.rect.y += self.speed * self.direction
         if self.rect.y < 15 or self.rect.y > 600:
             self.kill()
@@ -105,7 +105,7 @@ class Enemy(pygame.sprite.Sprite):
         self.image = self.images[self.index]
 
     def update(self, *args):
-        self.game.screen.blit(self.image, self.rect)
+        self.game.blit(self.image, self.rect)
 
     def load_images(self):
         images = {0: ['1_2', '1_1'],
@@ -133,7 +133,7 @@ class EnemiesGroup(pygame.sprite.Group):
         self.rightMoves = 30
         self.leftMoves = 30
         self.moveNumber = 15
-        self.timer = pygame.time.get_ticks()
+        self.timer = game.get_ticks()
         self.game = game
         self.bottom = self.game.enemyPosition + ((rows - 1) * 45) + 35
         self._aliveColumns = list(range(columns))
@@ -227,7 +227,7 @@ class Blocker(pygame.sprite.Sprite):
         self.game = game
 
     def update(self, keys, *args):
-        self.game.screen.blit(self.image, self.rect)
+        self.game.blit(self.image, self.rect)
 
 
 class Mystery(pygame.sprite.Sprite):
@@ -239,7 +239,7 @@ class Mystery(pygame.sprite.Sprite):
         self.row = 5
         self.moveTime = 25000
         self.direction = 1
-        self.timer = pygame.time.get_ticks()
+        self.timer = game.get_ticks()
         self.playSound = True
         self.game = game
 
@@ -251,10 +251,10 @@ class Mystery(pygame.sprite.Sprite):
                 self.playSound = False
             if self.rect.x < 840 and self.direction == 1:
                 self.rect.x += 2
-                self.game.screen.blit(self.image, self.rect)
+                self.game.blit(self.image, self.rect)
             if self.rect.x > -100 and self.direction == -1:
                 self.rect.x -= 2
-                self.game.screen.blit(self.image, self.rect)
+                self.game.blit(self.image, self.rect)
 
         if self.rect.x > 830:
             self.playSound = True
@@ -274,7 +274,7 @@ class EnemyExplosion(pygame.sprite.Sprite):
         self.image = pygame.transform.scale(self.get_image(enemy.row), (40, 35))
         self.image2 = pygame.transform.scale(self.get_image(enemy.row), (50, 45))
         self.rect = self.image.get_rect(topleft=(enemy.rect.x, enemy.rect.y))
-        self.timer = pygame.time.get_ticks()
+        self.timer = game.get_ticks()
         self.game = game
 
     @staticmethod
@@ -285,9 +285,9 @@ class EnemyExplosion(pygame.sprite.Sprite):
     def update(self, current_time, *args):
         passed = current_time - self.timer
         if passed <= 100:
-            self.game.screen.blit(self.image, self.rect)
+            self.game.blit(self.image, self.rect)
         elif passed <= 200:
-            self.game.screen.blit(self.image2, (self.rect.x - 6, self.rect.y - 6))
+            self.game.blit(self.image2, (self.rect.x - 6, self.rect.y - 6))
         elif 400 < passed:
             self.kill()
 
@@ -297,13 +297,13 @@ class MysteryExplosion(pygame.sprite.Sprite):
         super(MysteryExplosion, self).__init__(*groups)
         self.text = Text(FONT, 20, str(score), WHITE,
                          mystery.rect.x + 20, mystery.rect.y + 6)
-        self.timer = pygame.time.get_ticks()
+        self.timer = game.get_ticks()
         self.game = game
 
     def update(self, current_time, *args):
         passed = current_time - self.timer
         if passed <= 200 or 400 < passed <= 600:
-            self.text.draw(self.game.screen)
+            self.game.blit(self.text.surface, self.text.rect)
         elif 600 < passed:
             self.kill()
 
@@ -313,13 +313,13 @@ class ShipExplosion(pygame.sprite.Sprite):
         super(ShipExplosion, self).__init__(*groups)
         self.image = IMAGES['ship']
         self.rect = self.image.get_rect(topleft=(ship.rect.x, ship.rect.y))
-        self.timer = pygame.time.get_ticks()
+        self.timer = game.get_ticks()
         self.game = game
 
     def update(self, current_time, *args):
         passed = current_time - self.timer
         if 300 < passed <= 600:
-            self.game.screen.blit(self.image, self.rect)
+            self.game.blit(self.image, self.rect)
         elif 900 < passed:
             self.kill()
 
@@ -333,12 +333,23 @@ class Life(pygame.sprite.Sprite):
         self.game = game
 
     def update(self, *args):
-        self.game.screen.blit(self.image, self.rect)
+        self.game.blit(self.image, self.rect)
+
+
+FONTS = {}
+
+
+def get_font(textFont, size):
+    # Opening and parsing the TTF is expensive, so share one Font per size
+    key = (textFont, size)
+    if key not in FONTS:
+        FONTS[key] = pygame.font.Font(textFont, size)
+    return FONTS[key]
 
 
 class Text(object):
     def __init__(self, textFont, size, message, color, xpos, ypos):
-        self.font = pygame.font.Font(textFont, size)
+        self.font = get_font(textFont, size)
         self.surface = self.font.render(message, True, color)
         self.rect = self.surface.get_rect(topleft=(xpos, ypos))
 
@@ -346,14 +357,38 @@ class Text(object):
         surface.blit(self.surface, self.rect)
 
 
+class ValueText(Text):
+    def __init__(self, textFont, size, value, color, xpos, ypos):
+        self.color = color
+        self.value = value
+        Text.__init__(self, textFont, size, str(value), color, xpos, ypos)
+
+    def set(self, value):
+        # Only rasterize again when the value actually changes
+        if value == self.value:
+            return False
+        self.value = value
+        self.surface = self.font.render(str(value), True, self.color)
+        self.rect = self.surface.get_rect(topleft=self.rect.topleft)
+        return True
+
+
 class SpaceInvaders(object):
-    def __init__(self, clockTick):
+    def __init__(self, clockTick, frameTime=None, training=False):
         # It seems, in Linux buffersize=512 is not enough, use 4096 to prevent:
         #   ALSA lib pcm.c:7963:(snd_pcm_recover) underrun occurred
         pygame.mixer.pre_init(44100, -16, 1, 4096)
         pygame.init()
         self.clock = pygame.time.Clock()
         self.clockTick = clockTick
+        # With a frameTime the game runs on a simulated clock that advances
+        # frameTime ms per run_game() call, so headless runs are
+        # deterministic and not tied to wall-clock speed
+        self.frameTime = frameTime
+        self.ticks = 0
+        # Training skips transitions that carry no decisions (next round
+        # pause, respawn delay, explosions); scoring and lives are unchanged
+        self.training = training
         self.caption = pygame.display.set_caption('Space Invaders')
         self.screen = SCREEN
         self.background = pygame.image.load(IMAGE_PATH + 'background.jpg').convert()
@@ -373,12 +408,74 @@ class SpaceInvaders(object):
         self.enemy4Text = Text(FONT, 25, '   =  ?????', RED, 368, 420)
         self.scoreText = Text(FONT, 20, 'Score', WHITE, 5, 5)
         self.livesText = Text(FONT, 20, 'Lives ', WHITE, 640, 5)
+        self.scoreText2 = ValueText(FONT, 20, 0, GREEN, 85, 5)
 
         self.life1 = Life(self, 715, 3)
         self.life2 = Life(self, 742, 3)
         self.life3 = Life(self, 769, 3)
         self.livesGroup = pygame.sprite.Group(self.life1, self.life2, self.life3)
 
+        # Dirty-rectangle rendering: the static layer caches everything that
+        # only changes on discrete events (HUD labels, lives, intact blockers)
+        # so a frame only has to restore and push the regions sprites touched.
+        self.staticLayer = self.background.copy()
+        self.showNextRound = False
+        self.dirtyRects = []
+        self.staleRects = []
+        self.fullRedraw = True
+
+    def get_ticks(self):
+        if self.frameTime is None:
+            return pygame.time.get_ticks()
+        return self.ticks
+
+    def blit(self, image, position):
+        self.dirtyRects.append(self.screen.blit(image, position))
+
+    def begin_frame(self):
+        for rect in self.dirtyRects:
+            self.screen.blit(self.staticLayer, rect, rect)
+        self.staleRects = self.dirtyRects
+        self.dirtyRects = []
+
+    def build_static_layer(self, nextRound=False):
+        self.staticLayer.blit(self.background, (0, 0))
+        self.scoreText.draw(self.staticLayer)
+        self.scoreText2.set(self.score)
+        self.scoreText2.draw(self.staticLayer)
+        self.livesText.draw(self.staticLayer)
+        self.livesGroup.draw(self.staticLayer)
+        if nextRound:
+            self.nextRoundText.draw(self.staticLayer)
+        else:
+            self.allBlockers.draw(self.staticLayer)
+        self.showNextRound = nextRound
+        self.screen.blit(self.staticLayer, (0, 0))
+        self.dirtyRects = []
+        self.fullRedraw = True
+
+    def erase_static(self, *sprites):
+        for sprite in sprites:
+            self.staticLayer.blit(self.background, sprite.rect, sprite.rect)
+            self.screen.blit(self.staticLayer, sprite.rect, sprite.rect)
+            self.dirtyRects.append(sprite.rect.copy())
+
+    def update_score_text(self):
+        oldRect = self.scoreText2.rect
+        if self.scoreText2.set(self.score):
+            self.staticLayer.blit(self.background, oldRect, oldRect)
+            self.scoreText2.draw(self.staticLayer)
+            for rect in (oldRect, self.scoreText2.rect):
+                self.screen.blit(self.staticLayer, rect, rect)
+                self.dirtyRects.append(rect)
+
+    def update_display(self):
+        if self.fullRedraw:
+            pygame.display.update()
+            self.fullRedraw = False
+        else:
+            pygame.display.update(self.staleRects + self.dirtyRects)
+
     def reset(self, score):
         self.player = Ship(self)
         self.playerGroup = pygame.sprite.Group(self.player)
@@ -389,15 +486,16 @@ class SpaceInvaders(object):
         self.enemyBullets = pygame.sprite.Group()
         self.make_enemies()
         self.allSprites = pygame.sprite.Group(self.player, self.enemies,
-                                       self.livesGroup, self.mysteryShip)
+                                       self.mysteryShip)
         self.keys = pygame.key.get_pressed()
 
-        self.timer = pygame.time.get_ticks()
-        self.noteTimer = pygame.time.get_ticks()
-        self.shipTimer = pygame.time.get_ticks()
+        self.timer = self.get_ticks()
+        self.noteTimer = self.get_ticks()
+        self.shipTimer = self.get_ticks()
         self.score = score
         self.makeNewShip = False
         self.shipAlive = True
+        self.build_static_layer()
 
     def make_blockers(self, number):
         blockerGroup = pygame.sprite.Group()
@@ -454,13 +552,13 @@ class SpaceInvaders(object):
         self.enemies = enemies
 
     def make_enemies_shoot(self):
-        if (pygame.time.get_ticks() - self.timer) > 700 and self.enemies:
+        if (self.get_ticks() - self.timer) > 700 and self.enemies:
             enemy = self.enemies.random_bottom()
             self.enemyBullets.add(
                 Bullet(self, enemy.rect.x + 14, enemy.rect.y + 20, 1, 5,
                        'enemylaser', 'center'))
             self.allSprites.add(self.enemyBullets)
-            self.timer = pygame.time.get_ticks()
+            self.timer = self.get_ticks()
 
     def calculate_score(self, row):
         scores = {0: 30,
@@ -495,31 +593,33 @@ class SpaceInvaders(object):
         for enemy in pygame.sprite.groupcollide(self.enemies, self.bullets,
                                          True, True).keys():
             self.calculate_score(enemy.row)
-            EnemyExplosion(self, enemy, self.explosionsGroup)
-            self.gameTimer = pygame.time.get_ticks()
+            if not self.training:
+                EnemyExplosion(self, enemy, self.explosionsGroup)
+            self.gameTimer = self.get_ticks()
 
         for mystery in pygame.sprite.groupcollide(self.mysteryGroup, self.bullets,
                                            True, True).keys():
             score = self.calculate_score(mystery.row)
-            MysteryExplosion(self, mystery, score, self.explosionsGroup)
+            if not self.training:
+                MysteryExplosion(self, mystery, score, self.explosionsGroup)
             newShip = Mystery(self)
             self.allSprites.add(newShip)
             self.mysteryGroup.add(newShip)
 
         for player in pygame.sprite.groupcollide(self.playerGroup, self.enemyBullets,
                                           True, True).keys():
-            if self.life3.alive():
-                self.life3.kill()
-            elif self.life2.alive():
-                self.life2.kill()
-            elif self.life1.alive():
-                self.life1.kill()
+            for life in (self.life3, self.life2, self.life1):
+                if life.alive():
+                    life.kill()
+                    self.erase_static(life)
+                    break
             else:
                 self.gameOver = True
                 self.startGame = False
-            ShipExplosion(self, player, self.explosionsGroup)
+            if not self.training:
+                ShipExplosion(self, player, self.explosionsGroup)
             self.makeNewShip = True
-            self.shipTimer = pygame.time.get_ticks()
+            self.shipTimer = self.get_ticks()
             self.shipAlive = False
 
         if self.enemies.bottom >= 540:
@@ -528,13 +628,19 @@ class SpaceInvaders(object):
                 self.gameOver = True
                 self.startGame = False
 
-        pygame.sprite.groupcollide(self.bullets, self.allBlockers, True, True)
-        pygame.sprite.groupcollide(self.enemyBullets, self.allBlockers, True, True)
+        for blockers in pygame.sprite.groupcollide(self.bullets, self.allBlockers,
+                                                   True, True).values():
+            self.erase_static(*blockers)
+        for blockers in pygame.sprite.groupcollide(self.enemyBullets, self.allBlockers,
+                                                   True, True).values():
+            self.erase_static(*blockers)
         if self.enemies.bottom >= BLOCKERS_POSITION:
-            pygame.sprite.groupcollide(self.enemies, self.allBlockers, False, True)
+            for blockers in pygame.sprite.groupcollide(self.enemies, self.allBlockers,
+                                                       False, True).values():
+                self.erase_static(*blockers)
 
     def create_new_ship(self, createShip, currentTime):
-        if createShip and (currentTime - self.shipTimer > 900):
+        if createShip and (self.training or currentTime - self.shipTimer > 900):
             self.player = Ship(self)
             self.allSprites.add(self.player)
             self.playerGroup.add(self.player)
@@ -562,6 +668,7 @@ class SpaceInvaders(object):
     def main(self):
         while True:
             if self.mainScreen:
+                self.fullRedraw = True
                 self.screen.blit(self.background, (0, 0))
                 self.titleText.draw(self.screen)
                 self.titleText2.draw(self.screen)
@@ -588,12 +695,13 @@ class SpaceInvaders(object):
                 self.run_game()
 
             elif self.gameOver:
-                currentTime = pygame.time.get_ticks()
+                self.fullRedraw = True
+                currentTime = self.get_ticks()
                 # Reset enemy starting position
                 self.enemyPosition = ENEMY_DEFAULT_POSITION
                 self.create_game_over(currentTime)
 
-            pygame.display.update()
+            self.update_display()
             self.clock.tick(self.clockTick)
 
     def setup_game(self):
@@ -613,17 +721,17 @@ class SpaceInvaders(object):
         self.reset(0)
 
     def run_game(self):
-        if not self.enemies and not self.explosionsGroup:
-            currentTime = pygame.time.get_ticks()
+        if self.frameTime is not None:
+            self.ticks += self.frameTime
+        self.begin_frame()
+        if not self.enemies and self.training:
+            self.enemyPosition += ENEMY_MOVE_DOWN
+            self.reset(self.score)
+        elif not self.enemies and not self.explosionsGroup:
+            currentTime = self.get_ticks()
             if currentTime - self.gameTimer < 3000:
-                self.screen.blit(self.background, (0, 0))
-                self.scoreText2 = Text(FONT, 20, str(self.score),
-                                       GREEN, 85, 5)
-                self.scoreText.draw(self.screen)
-                self.scoreText2.draw(self.screen)
-                self.nextRoundText.draw(self.screen)
-                self.livesText.draw(self.screen)
-                self.livesGroup.update()
+                if not self.showNextRound:
+                    self.build_static_layer(nextRound=True)
                 self.check_input()
             if currentTime - self.gameTimer > 3000:
                 # Move enemies closer to bottom
@@ -631,20 +739,16 @@ class SpaceInvaders(object):
                 self.reset(self.score)
                 self.gameTimer += 3000
         else: # a new stage
-            currentTime = pygame.time.get_ticks()
-            self.screen.blit(self.background, (0, 0))
-            self.allBlockers.update(self.screen)
-            self.scoreText2 = Text(FONT, 20, str(self.score), GREEN,
-                                   85, 5)
-            self.scoreText.draw(self.screen)
-            self.scoreText2.draw(self.screen)
-            self.livesText.draw(self.screen)
+            currentTime = self.get_ticks()
+            self.update_score_text()
             self.check_input()
+            # Respawn before collisions, so even without a delay a death is
+            # seen for the whole step in which it happens
+            self.create_new_ship(self.makeNewShip, currentTime)
             self.enemies.update(currentTime)
             self.allSprites.update(self.keys, currentTime)
             self.explosionsGroup.update(currentTime)
             self.check_collisions()
-            self.create_new_ship(self.makeNewShip, currentTime)
             self.make_enemies_shoot()
 
         game_info = GameInfo(self.shipAlive, self.score)
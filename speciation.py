@@ -0,0 +1,206 @@
+"""
+Speciation for large populations.
+
+VectorSpeciesSet places genomes into species exactly like
+neat.DefaultSpeciesSet, but instead of calling genome.distance once per pair
+it encodes every genome as arrays aligned on a shared gene (innovation)
+index and computes the distances from one representative to the whole
+population in a single numpy batch. Encodings are cached per genome between
+generations, since elites and old representatives are carried over unchanged.
+"""
+import numpy
+from neat import DefaultSpeciesSet
+from neat.species import Species
+
+
+class GeneMatrix(object):
+    """
+    One kind of gene (nodes or connections) for a list of genomes: presence
+    of each gene column per genome, plus its numeric and categorical values.
+    """
+
+    def __init__(self, encodings):
+        columns = [e[0] for e in encodings]
+        counts = numpy.array([len(c) for c in columns])
+        all_columns = numpy.concatenate(columns) if columns else numpy.zeros(0, dtype=int)
+        used = numpy.unique(all_columns)
+        rows = numpy.repeat(numpy.arange(len(encodings)), counts)
+        index = numpy.searchsorted(used, all_columns)
+
+        shape = (len(encodings), len(used))
+        self.present = numpy.zeros(shape, dtype=bool)
+        self.present[rows, index] = True
+        self.numeric = self.stack(encodings, 1, shape, rows, index, numpy.float64)
+        self.categorical = self.stack(encodings, 2, shape, rows, index, numpy.int64)
+        self.counts = counts
+
+    @staticmethod
+    def stack(encodings, part, shape, rows, index, dtype):
+        width = encodings[0][part].shape[1] if encodings else 0
+        values = numpy.zeros(shape + (width,), dtype=dtype)
+        if len(rows):
+            values[rows, index] = numpy.concatenate([e[part] for e in encodings])
+        return values
+
+    def distances(self, i, rows, weight_coefficient, disjoint_coefficient):
+        """
+        Distance component from genome i to the genomes in rows, as computed
+        by the node / connection half of DefaultGenome.distance. Only the
+        columns of genome i's own genes are touched.
+        """
+        columns = numpy.flatnonzero(self.present[i])
+        block = numpy.ix_(rows, columns)
+        common = self.present[block]
+        differences = (numpy.abs(self.numeric[block] - self.numeric[i, columns]).sum(-1) +
+                       (self.categorical[block] != self.categorical[i, columns]).sum(-1))
+        homologous = (differences * common).sum(1) * weight_coefficient
+        counts = self.counts[rows]
+        disjoint = self.counts[i] + counts - 2 * common.sum(1)
+        size = numpy.maximum(counts, self.counts[i])
+        return numpy.where(size > 0,
+                           (homologous + disjoint_coefficient * disjoint) / numpy.maximum(size, 1),
+                           0.0)
+
+
+class VectorSpeciesSet(DefaultSpeciesSet):
+    """ Vectorized drop-in for DefaultSpeciesSet, for pop_size in the thousands. """
+
+    def __init__(self, config, reporters):
+        super(VectorSpeciesSet, self).__init__(config, reporters)
+        self.node_columns = {}
+        self.connection_columns = {}
+        self.names = {}
+        self.encodings = {}
+
+    def __getstate__(self):
+        # The encoding cache is rebuilt on demand, so keep it out of checkpoints
+        state = dict(self.__dict__)
+        state['encodings'] = {}
+        return state
+
+    @staticmethod
+    def column(columns, key):
+        if key not in columns:
+            columns[key] = len(columns)
+        return columns[key]
+
+    def name_code(self, name):
+        return self.column(self.names, name)
+
+    def encode(self, genome):
+        cached = self.encodings.get(genome.key)
+        if cached is not None and cached[0] is genome:
+            return cached
+
+        nodes = list(genome.nodes.items())
+        connections = list(genome.connections.items())
+        node_encoding = (
+            numpy.array([self.column(self.node_columns, k) for k, _ in nodes], dtype=int),
+            numpy.array([(n.bias, n.response) for _, n in nodes], dtype=numpy.float64).reshape(-1, 2),
+            numpy.array([(self.name_code(n.activation), self.name_code(n.aggregation))
+                         for _, n in nodes], dtype=numpy.int64).reshape(-1, 2))
+        connection_encoding = (
+            numpy.array([self.column(self.connection_columns, k) for k, _ in connections], dtype=int),
+            numpy.array([(c.weight,) for _, c in connections], dtype=numpy.float64).reshape(-1, 1),
+            numpy.array([(c.enabled,) for _, c in connections], dtype=numpy.int64).reshape(-1, 1))
+        return genome, node_encoding, connection_encoding
+
+    def speciate(self, config, population, generation):
+        """
+        Place genomes into species by genetic similarity, with the same
+        assignment rules as DefaultSpeciesSet.speciate.
+        """
+        assert isinstance(population, dict)
+
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+        genome_config = config.genome_config
+        weight_coefficient = genome_config.compatibility_weight_coefficient
+        disjoint_coefficient = genome_config.compatibility_disjoint_coefficient
+
+        keys = list(population)
+        size = len(keys)
+        genomes = [population[k] for k in keys]
+        genomes += [s.representative for s in self.species.values()]
+        encodings = [self.encode(g) for g in genomes]
+        # Only genomes still alive or representing a species stay cached
+        self.encodings = dict((e[0].key, e) for e in encodings)
+        nodes = GeneMatrix([e[1] for e in encodings])
+        connections = GeneMatrix([e[2] for e in encodings])
+
+        computed = []
+
+        def distances(i, rows):
+            d = (nodes.distances(i, rows, weight_coefficient, disjoint_coefficient) +
+                 connections.distances(i, rows, weight_coefficient, disjoint_coefficient))
+            computed.append(d)
+            return d
+
+        # Find the best representatives for each existing species.
+        unspeciated = numpy.ones(size, dtype=bool)
+        new_representatives = {}
+        new_members = {}
+        for r, sid in enumerate(self.species):
+            if not unspeciated.any():
+                break
+            candidates = numpy.flatnonzero(unspeciated)
+            new_rid = candidates[numpy.argmin(distances(size + r, candidates))]
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated[new_rid] = False
+
+        # Closest compatible representative so far for every unspeciated genome.
+        best_distance = numpy.full(size, numpy.inf)
+        best_species = numpy.full(size, -1)
+
+        def offer(sid, rid):
+            rows = numpy.flatnonzero(unspeciated)
+            d = distances(rid, rows)
+            closer = (d < compatibility_threshold) & (d < best_distance[rows])
+            best_distance[rows[closer]] = d[closer]
+            best_species[rows[closer]] = sid
+
+        for sid, rid in list(new_representatives.items()):
+            offer(sid, rid)
+
+        # Partition population into species. Genomes are taken in order, so the
+        # first one with no compatible representative founds a new species and
+        # is offered to every genome after it; the ones before are settled.
+        while unspeciated.any():
+            founders = numpy.flatnonzero(unspeciated & (best_species < 0))
+            if not founders.size:
+                break
+            gid = founders[0]
+            unspeciated[:gid + 1] = False
+            sid = next(self.indexer)
+            new_representatives[sid] = gid
+            new_members[sid] = [gid]
+            offer(sid, gid)
+
+        for gid in numpy.flatnonzero(best_species >= 0):
+            new_members[best_species[gid]].append(gid)
+
+        # Species left without any genome to represent them die out.
+        for sid in list(self.species):
+            if sid not in new_representatives:
+                del self.species[sid]
+
+        # Update species collection based on new speciation.
+        self.genome_to_species = {}
+        for sid, rid in new_representatives.items():
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+
+            members = [keys[i] for i in new_members[sid]]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+
+            member_dict = dict((gid, population[gid]) for gid in members)
+            s.update(population[keys[rid]], member_dict)
+
+        all_distances = numpy.concatenate(computed) if computed else numpy.zeros(0)
+        gdmean = all_distances.mean() if all_distances.size else 0.0
+        gdstdev = all_distances.std() if all_distances.size else 0.0
+        self.reporters.info(
+            'Mean genetic distance {0:.3f}, standard deviation {1:.3f}'.format(gdmean, gdstdev))
@@ -0,0 +1,132 @@
+import multiprocessing
+import queue
+import random
+
+
+def evaluate(fitness_function, key, genome, config):
+    return key, fitness_function(genome, config)
+
+
+class SteadyStateEvolution:
+    """
+    Asynchronous, steady-state evolution on top of a neat.Population.
+
+    There is no generation barrier: every worker always has a genome to play,
+    and each finished evaluation immediately replaces the worst genome of the
+    population and breeds one new child. Every pop_size evaluations count as a
+    generation for speciation, reporters and checkpoints.
+    """
+
+    def __init__(self, population, num_workers=None, tournament_size=2):
+        self.population = population
+        self.config = population.config
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.tournament_size = tournament_size
+        self.members = {}
+        self.evaluations = 0
+
+    def run(self, fitness_function, max_evaluations=None):
+        """
+        Evolve until max_evaluations genomes have been played or the fitness
+        threshold is reached. fitness_function takes (genome, config) and
+        returns the fitness, like neat.ParallelEvaluator's eval_function.
+        """
+        p = self.population
+        results = queue.Queue()
+        backlog = list(p.population.values())
+        # Spawned workers import the game without a window of their own
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(self.num_workers)
+        in_flight = {}
+
+        def submit(genome):
+            in_flight[genome.key] = genome
+            pool.apply_async(evaluate, (fitness_function, genome.key, genome, self.config),
+                             callback=results.put, error_callback=results.put)
+
+        p.reporters.start_generation(p.generation)
+        try:
+            while backlog and len(in_flight) < self.num_workers:
+                submit(backlog.pop(0))
+
+            while max_evaluations is None or self.evaluations < max_evaluations:
+                result = results.get()
+                if isinstance(result, BaseException):
+                    raise result
+                key, fitness = result
+                genome = in_flight.pop(key)
+                genome.fitness = fitness
+                self.add_member(genome)
+                self.evaluations += 1
+
+                if self.evaluations % self.config.pop_size == 0:
+                    if self.end_generation() or self.evaluations == max_evaluations:
+                        break
+                    p.reporters.start_generation(p.generation)
+
+                submit(backlog.pop(0) if backlog else self.breed())
+        finally:
+            pool.terminate()
+
+        return p.best_genome
+
+    def add_member(self, genome):
+        p = self.population
+        self.members[genome.key] = genome
+        if p.best_genome is None or genome.fitness > p.best_genome.fitness:
+            p.best_genome = genome
+        if len(self.members) > self.config.pop_size:
+            worst = min(self.members.values(), key=lambda g: g.fitness)
+            del self.members[worst.key]
+
+    def tournament(self, candidates):
+        contenders = random.sample(candidates, min(self.tournament_size, len(candidates)))
+        return max(contenders, key=lambda g: g.fitness)
+
+    def breed(self):
+        p = self.population
+        genome_config = self.config.genome_config
+        if hasattr(p.reproduction, 'innovation_tracker'):
+            genome_config.innovation_tracker = p.reproduction.innovation_tracker
+
+        parent1 = self.tournament(list(self.members.values()))
+        sid = p.species.genome_to_species.get(parent1.key)
+        mates = [self.members[k] for k in p.species.species[sid].members
+                 if k in self.members] if sid in p.species.species else []
+        parent2 = self.tournament(mates) if mates else parent1
+
+        key = next(p.reproduction.genome_indexer)
+        child = self.config.genome_type(key)
+        child.configure_crossover(parent1, parent2, genome_config)
+        child.mutate(genome_config)
+        p.reproduction.ancestors[key] = (parent1.key, parent2.key)
+        return child
+
+    def end_generation(self):
+        """
+        Speciate and report the current members as one generation. Returns
+        True once the fitness threshold has been reached.
+        """
+        p = self.population
+        p.species.speciate(self.config, self.members, p.generation)
+        for s in p.species.species.values():
+            s.fitness = max(s.get_fitnesses())
+            if not s.fitness_history or s.fitness > max(s.fitness_history):
+                s.last_improved = p.generation
+            s.fitness_history.append(s.fitness)
+
+        best = max(self.members.values(), key=lambda g: g.fitness)
+        p.reporters.post_evaluate(self.config, self.members, p.species, best)
+
+        if not self.config.no_fitness_termination:
+            fv = p.fitness_criterion(g.fitness for g in self.members.values())
+            if fv >= self.config.fitness_threshold:
+                p.reporters.found_solution(self.config, p.generation, best)
+                return True
+
+        p.population = dict(self.members)
+        p.reporters.end_generation(self.config, p.population, p.species)
+        p.generation += 1
+        if hasattr(p.reproduction, 'innovation_tracker'):
+            p.reproduction.innovation_tracker.reset_generation()
+        return False
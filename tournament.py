@@ -0,0 +1,112 @@
+"""
+Headless batch evaluation of saved genomes.
+
+Scores the winner pickle and every genome of any neat-checkpoint-N files over
+the same fixed set of seeds, in parallel, on the game's simulated clock:
+
+    python tournament.py best.pickle neat-checkpoint-0 neat-checkpoint-4
+"""
+import os
+
+# Set before the game is imported so neither we nor the workers open a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import multiprocessing
+import pickle
+import random
+
+import neat
+import numpy
+
+from main import PlayGame
+
+FRAME_TIME = 1000 / 60
+PERCENTILES = (5, 25, 50, 75, 95)
+
+config = None
+
+
+def init_worker(worker_config):
+    global config
+    config = worker_config
+
+
+def play(task):
+    """
+    Play one episode, up to the first death, and return its score. Training
+    rules only skip transitions, so scores match the normal game.
+    """
+    label, genome, seed, max_steps = task
+    random.seed(seed)
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    player = PlayGame(FRAME_TIME, training=True)
+    game = player.game
+    game.setup_game()
+    steps = 0
+    while game.shipAlive and not game.gameOver and steps < max_steps:
+        game.run_game()
+        player.move_ai_ship(net)
+        steps += 1
+    return label, game.score
+
+
+def load_genomes(filenames):
+    genomes = []
+    for filename in filenames:
+        if os.path.basename(filename).startswith('neat-checkpoint-'):
+            population = neat.Checkpointer.restore_checkpoint(filename)
+            for key, genome in sorted(population.population.items()):
+                genomes.append(('{}:{}'.format(os.path.basename(filename), key), genome))
+        else:
+            with open(filename, 'rb') as f:
+                genomes.append((os.path.basename(filename), pickle.load(f)))
+    return genomes
+
+
+def run_tournament(config, genomes, seeds, workers=None, max_steps=100000):
+    """
+    Score every (label, genome) pair over seeds and return {label: scores}.
+    """
+    tasks = [(label, genome, seed, max_steps)
+             for label, genome in genomes for seed in seeds]
+    scores = {label: [] for label, _ in genomes}
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+        for label, score in pool.imap_unordered(play, tasks, chunksize=4):
+            scores[label].append(score)
+    return scores
+
+
+def print_report(scores):
+    header = '{:<28} {:>9} {:>11}'.format('genome', 'mean', 'variance')
+    header += ''.join(' {:>7}'.format('p{}'.format(q)) for q in PERCENTILES)
+    print(header)
+    print('=' * len(header))
+    ranked = sorted(scores.items(), key=lambda item: numpy.mean(item[1]), reverse=True)
+    for label, values in ranked:
+        line = '{:<28} {:>9.1f} {:>11.1f}'.format(label, numpy.mean(values), numpy.var(values))
+        line += ''.join(' {:>7.0f}'.format(p) for p in numpy.percentile(values, PERCENTILES))
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='+',
+                        help='pickled genomes and/or neat-checkpoint-N files')
+    parser.add_argument('--seeds', type=int, default=100,
+                        help='number of fixed seeds each genome plays')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-steps', type=int, default=100000,
+                        help='frames after which an episode is cut off')
+    args = parser.parse_args()
+
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'neatConfig.txt'))
+
+    scores = run_tournament(config, load_genomes(args.files), range(args.seeds),
+                            args.workers, args.max_steps)
+    print_report(scores)